@@ -4,25 +4,39 @@
 # - Marks product_archived when a product URL redirects to a collection/landing page
 # - Keeps in-app traceback capture and debug output for Chairish linking
 # - No Pillow dependency; thumbnail heuristics used
+import io
 import os
+import hashlib
 import uuid
 import json
 import time
 import re
+import sqlite3
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from decimal import Decimal, InvalidOperation
-from typing import Any, Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from urllib.parse import urlparse, urljoin, quote_plus
 from html import escape as html_escape
 from datetime import datetime
 
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import streamlit as st
 import google.generativeai as genai
 from google.oauth2 import service_account
 from google.auth.transport.requests import Request
-import streamlit.components.v1 as components
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 # ==========================================
@@ -37,12 +51,10 @@ st.set_page_config(page_title="Newel Appraiser MVP", layout="wide")
 NEWEL_MAROON = "#8B0000"
 NEWEL_MAROON_HOVER = "#A30000"
 
-def apply_newel_branding():
-    components.html(
-        f"""
-<link href="https://fonts.googleapis.com/css2?family=EB+Garamond:wght@400;600;700&display=swap" rel="stylesheet">
-<meta name="color-scheme" content="light">
-<style>
+# Built once at import; the palette basics also live in .streamlit/config.toml [theme] so the first paint is on-brand.
+# Markdown treats this as one raw HTML block only while it opens with <style>; anything else ends the block at the first blank line.
+NEWEL_BRAND_CSS = f"""<style>
+@import url("https://fonts.googleapis.com/css2?family=EB+Garamond:wght@400;600;700&display=swap");
 :root{{
   --bg: #FBF5EB;
   --bg2:#F6EFE4;
@@ -127,10 +139,11 @@ button:hover, .stButton>button:hover {{
 
 textarea {{ color: var(--text) !important; background: #FFFFFF !important; }}
 </style>
-        """,
-        height=0,
-        scrolling=False,
-    )
+"""
+
+def apply_newel_branding():
+    # Injected into the app document itself; a components.html iframe would scope the rules to the iframe.
+    st.markdown(NEWEL_BRAND_CSS, unsafe_allow_html=True)
 
 apply_newel_branding()
 
@@ -138,6 +151,8 @@ apply_newel_branding()
 # ==========================================
 # 3) SECRETS + HELPERS
 # ==========================================
+# Secrets don't change while the script runs; resolve each name once instead of going through st.secrets per call.
+@lru_cache(maxsize=None)
 def _get_secret(name: str) -> str:
     if name in st.secrets:
         return str(st.secrets[name])
@@ -146,6 +161,7 @@ def _get_secret(name: str) -> str:
         raise RuntimeError(f"Missing required secret: {name}")
     return val
 
+@lru_cache(maxsize=None)
 def _get_optional_secret(name: str) -> Optional[str]:
     if name in st.secrets:
         v = str(st.secrets[name]).strip()
@@ -153,6 +169,26 @@ def _get_optional_secret(name: str) -> Optional[str]:
     v = os.getenv(name)
     return v.strip() if v else None
 
+# One botocore client per process; building it re-reads credentials and endpoint data.
+@st.cache_resource
+def _s3_client():
+    return boto3.client(
+        "s3",
+        region_name=_get_secret("AWS_REGION"),
+        aws_access_key_id=_get_secret("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=_get_secret("AWS_SECRET_ACCESS_KEY"),
+        config=BotoConfig(max_pool_connections=20, retries={"max_attempts": 3, "mode": "standard"}),
+    )
+
+# Photos above 8 MB go up as parallel multipart parts; smaller ones stay a single PUT.
+S3_UPLOAD_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True,
+)
+
+@lru_cache(maxsize=512)
 def _hostname(url: str) -> str:
     try:
         h = urlparse(url).netloc.lower()
@@ -162,6 +198,11 @@ def _hostname(url: str) -> str:
     except Exception:
         return ""
 
+def _json_loads(raw: str) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
 def _container_border():
     try:
         return st.container(border=True)
@@ -175,40 +216,59 @@ def _container_border():
 AUCTION_DOMAINS = {"liveauctioneers.com", "bidsquare.com", "sothebys.com", "christies.com"}
 RETAIL_DOMAINS = {"1stdibs.com", "chairish.com", "incollect.com", "rauantiques.com"}
 
-def _kind_from_domain(url: str) -> str:
-    host = _hostname(url)
-    if any(host.endswith(d) for d in AUCTION_DOMAINS):
-        return "auction"
-    if any(host.endswith(d) for d in RETAIL_DOMAINS):
-        return "retail"
+DOMAIN_KINDS = {**{d: "auction" for d in AUCTION_DOMAINS}, **{d: "retail" for d in RETAIL_DOMAINS}}
+
+@lru_cache(maxsize=512)
+def _kind_from_host(host: str) -> str:
+    # Check each dot-suffix ("lots.bidsquare.com", "bidsquare.com") with one dict lookup apiece.
+    parts = host.split(".")
+    for i in range(len(parts) - 1):
+        kind = DOMAIN_KINDS.get(".".join(parts[i:]))
+        if kind:
+            return kind
     return "other"
 
+def _kind_from_domain(url: str) -> str:
+    return _kind_from_host(_hostname(url))
+
 
 # ==========================================
 # 5) GEMINI CLIENT
 # ==========================================
+# Per-request cap so a hung call can't hold a shared scrape worker indefinitely.
+GEMINI_REQUEST_TIMEOUT = 30
+
 def _gemini_model():
     genai.configure(api_key=_get_secret("GEMINI_API_KEY"))
     return genai.GenerativeModel("gemini-2.0-flash")
 
-def _gemini_json(prompt: str, retries: int = 3) -> dict:
+def _gemini_json_uncached(prompt: str, retries: int = 3) -> dict:
     model = _gemini_model()
     last_err = None
     for i in range(retries):
         try:
-            resp = model.generate_content(prompt, generation_config={"response_mime_type": "application/json"})
-            return json.loads(resp.text)
+            resp = model.generate_content(
+                prompt,
+                generation_config={"response_mime_type": "application/json"},
+                request_options={"timeout": GEMINI_REQUEST_TIMEOUT},
+            )
+            return _json_loads(resp.text)
         except Exception as e:
             last_err = e
             time.sleep(1.0 * (2 ** i))
     raise RuntimeError(f"Gemini JSON call failed: {last_err}")
 
+# Same prompt, same page text: reuse the answer across sessions for a day instead of paying for another call.
+@st.cache_data(ttl=86400, show_spinner=False, max_entries=512)
+def _gemini_json(prompt: str, retries: int = 3) -> dict:
+    return _gemini_json_uncached(prompt, retries)
+
 def _gemini_text(prompt: str, retries: int = 3) -> str:
     model = _gemini_model()
     last_err = None
     for i in range(retries):
         try:
-            resp = model.generate_content(prompt)
+            resp = model.generate_content(prompt, request_options={"timeout": GEMINI_REQUEST_TIMEOUT})
             return (resp.text or "").strip()
         except Exception as e:
             last_err = e
@@ -219,56 +279,64 @@ def _gemini_text(prompt: str, retries: int = 3) -> str:
 # ==========================================
 # 6) MONEY SANITIZATION
 # ==========================================
+# Grouped thousands need at least one comma so "1200" is read whole rather than as "120".
 MONEY_CAPTURE_RE = re.compile(
-    r'(?:(?:USD|US\$)\s*)?\$?\s*([0-9]{1,3}(?:,[0-9]{3})*(?:\.[0-9]{1,2})?|[0-9]+(?:\.[0-9]{1,2})?)',
+    r'(?:(?:USD|US\$)\s*)?\$?\s*([0-9]{1,3}(?:,[0-9]{3})+(?:\.[0-9]{1,2})?|[0-9]+(?:\.[0-9]{1,2})?)',
     re.IGNORECASE
 )
+TAG_RE = re.compile(r"<[^>]+>")
 
-def _to_decimal_money(v: Any) -> Optional[Decimal]:
-    if v is None:
+def _to_cents(v: Any) -> Optional[int]:
+    if v is None or isinstance(v, bool):
         return None
-    if isinstance(v, Decimal):
-        return v
-    if isinstance(v, (int, float)):
+    if isinstance(v, int):
+        return v * 100
+    if isinstance(v, (float, Decimal)):
         try:
-            return Decimal(str(v))
-        except Exception:
+            return int(Decimal(str(v)) * 100)
+        except (InvalidOperation, ValueError, OverflowError):
             return None
-    s = str(v)
-    s = re.sub(r"<[^>]+>", "", s).strip()
+    return _str_to_cents(str(v))
+
+# Pages repeat the same price strings (JSON-LD, meta, page text), so parsed strings are kept.
+@lru_cache(maxsize=2048)
+def _str_to_cents(raw: str) -> Optional[int]:
+    s = TAG_RE.sub("", raw).strip()
     if not s:
         return None
     m = MONEY_CAPTURE_RE.search(s)
     if not m:
         return None
-    try:
-        return Decimal(m.group(1).replace(",", ""))
-    except InvalidOperation:
-        return None
+    dollars, _, frac = m.group(1).replace(",", "").partition(".")
+    return int(dollars) * 100 + int(frac.ljust(2, "0") or 0)
 
-def _format_money(d: Decimal) -> str:
-    if d == d.to_integral():
-        return f"${int(d):,}"
-    return f"${d:,.2f}"
+def _format_cents(cents: int) -> str:
+    dollars, rem = divmod(cents, 100)
+    if not rem:
+        return f"${dollars:,}"
+    return f"${dollars:,}.{rem:02d}"
 
-def _sanitize_money(v: Any) -> Optional[str]:
-    d = _to_decimal_money(v)
-    if d is None:
+def _cents_to_money(cents: int) -> Optional[str]:
+    if cents < 100 or cents > 20_000_000_000:
         return None
-    if d < Decimal("1") or d > Decimal("200000000"):
+    return _format_cents(cents)
+
+def _sanitize_money(v: Any) -> Optional[str]:
+    c = _to_cents(v)
+    if c is None:
         return None
-    return _format_money(d)
+    return _cents_to_money(c)
 
 def _sanitize_range(lo: Any, hi: Any) -> Tuple[Optional[str], Optional[str]]:
-    dlo = _to_decimal_money(lo)
-    dhi = _to_decimal_money(hi)
-    if dlo is None or dhi is None:
+    clo = _to_cents(lo)
+    chi = _to_cents(hi)
+    if clo is None or chi is None:
         return None, None
-    if dhi < dlo:
-        dlo, dhi = dhi, dlo
-    if dlo < Decimal("1") or dhi < Decimal("1"):
+    if chi < clo:
+        clo, chi = chi, clo
+    if clo < 100:
         return None, None
-    return _format_money(dlo), _format_money(dhi)
+    return _format_cents(clo), _format_cents(chi)
 
 
 # ==========================================
@@ -282,39 +350,178 @@ DEFAULT_HEADERS = {
     "Pragma": "no-cache",
 }
 
+# Transient upstream errors are retried twice with backoff; after that the final response is returned as-is.
+LISTING_RETRY = Retry(
+    total=2,
+    backoff_factor=0.3,
+    status_forcelist=(429, 500, 502, 503, 504),
+    respect_retry_after_header=False,
+    raise_on_status=False,
+)
+# (connect, read): a host that won't accept a connection is abandoned quickly; a slow page still gets the full read budget.
+LISTING_TIMEOUT = (5, 18)
+
 def _get_session() -> requests.Session:
     if "http_session" not in st.session_state:
         s = requests.Session()
         s.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=LISTING_RETRY)
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
         st.session_state["http_session"] = s
         st.session_state["la_logged_in"] = False
     return st.session_state["http_session"]
 
+# SerpAPI calls carry no cookies, so one pooled session is shared by every user and rerun.
+@st.cache_resource
+def _serpapi_session() -> requests.Session:
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=10, max_retries=LISTING_RETRY)
+    s.mount("https://", adapter)
+    return s
+
+def _preconnect(session: requests.Session, url: str):
+    try:
+        session.head(url, timeout=3)
+    except Exception:
+        pass
+
+# Once per process: open the TLS connection to SerpAPI in the background so the first Lens call finds it pooled.
+@st.cache_resource
+def _warm_serpapi_connection() -> threading.Thread:
+    t = threading.Thread(target=_preconnect, args=(_serpapi_session(), "https://serpapi.com/"), daemon=True)
+    t.start()
+    return t
+
+_warm_serpapi_connection()
+
+# Keyed on the image content only; the leading underscore keeps the per-run presigned URL out of the cache key.
+@st.cache_data(ttl=86400, show_spinner=False, max_entries=64)
+def _lens_search(image_sha256: str, _presigned_url: str) -> dict:
+    r = _serpapi_session().get(
+        "https://serpapi.com/search.json",
+        params={"engine": "google_lens", "url": _presigned_url, "api_key": _get_secret("SERPAPI_API_KEY")},
+        timeout=(5, 55),
+    )
+    r.raise_for_status()
+    return r.json()
+
+HTML_MAX_BYTES = 350000
+# Auction lots put estimates in trailing __NEXT_DATA__/lot-detail markup, the retail hosts render
+# product JSON-LD and prices in the body, and Chairish collection pages list product links far down
+# the page, so every host we extract from keeps the larger cap. The default covers hosts added to the
+# kind lists later, until their pages have been checked.
+HTML_MAX_BYTES_LARGE = 1200000
+LARGE_PAGE_DOMAINS = (
+    "sothebys.com",
+    "christies.com",
+    "liveauctioneers.com",
+    "bidsquare.com",
+    "chairish.com",
+    "1stdibs.com",
+    "incollect.com",
+    "rauantiques.com",
+)
+
+def _html_cap(url: str) -> int:
+    host = _hostname(url)
+    if any(host == d or host.endswith("." + d) for d in LARGE_PAGE_DOMAINS):
+        return HTML_MAX_BYTES_LARGE
+    return HTML_MAX_BYTES
+
+def _decode_body(raw: bytes, encoding: Optional[str]) -> str:
+    try:
+        return raw.decode(encoding or "utf-8", errors="replace")
+    except LookupError:
+        return raw.decode("utf-8", errors="replace")
+
+HEAD_CLOSE_RE = re.compile(rb"</head\s*>", re.IGNORECASE)
+HEAD_USD_PRICE_RE = re.compile(rb'"priceCurrency"\s*:\s*"USD"', re.IGNORECASE)
+
+def _head_has_usd_price(head: str) -> bool:
+    # A USD currency marker alone isn't enough: "price": "0" or a range-only offer must keep the body coming.
+    return any(c > 0 for c in _jsonld_offer_prices_usd(_parse_jsonld_blocks_until(head, len(head))))
+
+def _fetch_page(
+    url: str,
+    session: requests.Session,
+    validators: Optional[Dict[str, str]] = None,
+    stop_at_priced_head: bool = False,
+) -> Tuple[Optional[str], Optional[int], Optional[str], Dict[str, str]]:
+    """
+    Returns (html_snippet, status_code, final_url_after_redirects, validators).
+    validators holds the response's ETag/Last-Modified; passing them back in makes the request
+    conditional, and a 304 comes back as (None, 304, final_url, validators).
+    The body is streamed and reading stops at the host's byte cap; the rest is never downloaded.
+    With stop_at_priced_head, reading also stops at </head> when the head's JSON-LD already yields a positive USD price.
+    """
+    headers = {}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+    try:
+        with session.get(url, headers=headers, timeout=LISTING_TIMEOUT, allow_redirects=True, stream=True) as r:
+            final = r.url
+            seen = {}
+            if r.headers.get("ETag"):
+                seen["etag"] = r.headers["ETag"]
+            if r.headers.get("Last-Modified"):
+                seen["last_modified"] = r.headers["Last-Modified"]
+            if r.status_code == 304:
+                return None, r.status_code, final, seen or dict(validators or {})
+            if r.status_code >= 400:
+                return None, r.status_code, final, {}
+            cap = _html_cap(url)
+            buf = bytearray()
+            head_pending = stop_at_priced_head
+            for chunk in r.iter_content(chunk_size=65536):
+                start = max(0, len(buf) - 16)
+                buf.extend(chunk)
+                if len(buf) >= cap:
+                    break
+                if head_pending:
+                    head_end = HEAD_CLOSE_RE.search(buf, start)
+                    if head_end:
+                        # The byte regex is a cheap gate; only a head that mentions USD gets parsed.
+                        if HEAD_USD_PRICE_RE.search(buf, 0, head_end.start()):
+                            head = _decode_body(bytes(buf[:head_end.start()]), r.encoding)
+                            if _head_has_usd_price(head):
+                                break
+                        head_pending = False
+            return _decode_body(bytes(buf[:cap]), r.encoding), r.status_code, final, seen
+    except Exception:
+        return None, None, None, {}
+
 def _fetch_html(url: str, session: requests.Session) -> Tuple[Optional[str], Optional[int], Optional[str]]:
     """
     Returns (html_snippet, status_code, final_url_after_redirects).
     final_url may be None on network error.
     """
-    try:
-        r = session.get(url, timeout=18, allow_redirects=True)
-        final = r.url
-        if r.status_code >= 400:
-            return None, r.status_code, final
-        return (r.text or "")[:1200000], r.status_code, final
-    except Exception:
-        return None, None, None
+    html, status, final, _ = _fetch_page(url, session)
+    return html, status, final
 
+# Scripts and styles are dropped with their bodies; any other tag is dropped on its own.
+HTML_STRIP_RE = re.compile(r"<script\b[^>]*>.*?</script>|<style\b[^>]*>.*?</style>|<[^>]+>", re.IGNORECASE | re.DOTALL)
+WHITESPACE_RE = re.compile(r"\s+")
+
+# The auction/retail extractors and the Gemini fallback clean the same page; keep the last few results.
+@lru_cache(maxsize=16)
 def _clean_html_text(html: str) -> str:
-    t = re.sub(r"<script.*?>.*?</script>", " ", html, flags=re.IGNORECASE | re.DOTALL)
-    t = re.sub(r"<style.*?>.*?</style>", " ", t, flags=re.IGNORECASE | re.DOTALL)
-    t = re.sub(r"<[^>]+>", " ", t)
-    t = re.sub(r"\s+", " ", t)
+    t = HTML_STRIP_RE.sub(" ", html)
+    t = WHITESPACE_RE.sub(" ", t)
     return t[:350000]
 
 
 # ==========================================
 # 8) LiveAuctioneers login (optional)
 # ==========================================
+# A response that still shows the sign-in form means the login did not take.
+SIGN_IN_WORD_RE = re.compile(r"sign in", re.IGNORECASE)
+PASSWORD_WORD_RE = re.compile(r"password", re.IGNORECASE)
+CSRF_TOKEN_RE = re.compile(r'name="csrfmiddlewaretoken"\s+value="([^"]+)"', re.IGNORECASE)
+
 def _try_login_liveauctioneers(session: requests.Session) -> bool:
     username = _get_optional_secret("LIVEAUCTIONEERS_USERNAME")
     password = _get_optional_secret("LIVEAUCTIONEERS_PASSWORD")
@@ -328,18 +535,18 @@ def _try_login_liveauctioneers(session: requests.Session) -> bool:
         if not html:
             return False
         csrf = None
-        m = re.search(r'name="csrfmiddlewaretoken"\s+value="([^"]+)"', html, re.IGNORECASE)
+        m = CSRF_TOKEN_RE.search(html)
         if m:
             csrf = m.group(1)
         post_url = "https://www.liveauctioneers.com/login/"
         data = {"username": username, "email": username, "password": password}
         if csrf:
             data["csrfmiddlewaretoken"] = csrf
-        r = session.post(post_url, data=data, timeout=18, allow_redirects=True)
+        r = session.post(post_url, data=data, timeout=LISTING_TIMEOUT, allow_redirects=True)
         if r.status_code >= 400:
             return False
-        txt = (r.text or "").lower()
-        if "sign in" in txt and "password" in txt:
+        txt = r.text or ""
+        if SIGN_IN_WORD_RE.search(txt) and PASSWORD_WORD_RE.search(txt):
             return False
         st.session_state["la_logged_in"] = True
         return True
@@ -358,46 +565,55 @@ USD_RANGE_RE = re.compile(
     r'([0-9]{1,3}(?:,[0-9]{3})*(?:\.[0-9]{1,2})?)\s*(?:-|–|to)\s*([0-9]{1,3}(?:,[0-9]{3})*(?:\.[0-9]{1,2})?)\s*(?:USD|US\$)\b',
     re.IGNORECASE
 )
+ESTIMATE_NEAR_RANGE_RE = re.compile(
+    r'(?:estimate[^0-9]{0,60})\b([0-9]{1,3}(?:,[0-9]{3})*(?:\.[0-9]{1,2})?)\s*(?:-|–|to)\s*([0-9]{1,3}(?:,[0-9]{3})*(?:\.[0-9]{1,2})?)',
+    re.IGNORECASE
+)
+LA_LOW_AMOUNT_RE = re.compile(r'"lowEstimate"\s*:\s*\{[^}]*"amount"\s*:\s*([0-9]+(?:\.[0-9]{1,2})?)', re.IGNORECASE)
+LA_HIGH_AMOUNT_RE = re.compile(r'"highEstimate"\s*:\s*\{[^}]*"amount"\s*:\s*([0-9]+(?:\.[0-9]{1,2})?)', re.IGNORECASE)
+BIDSQUARE_LOW_RE = re.compile(r'"(?:estimate_low|lowEstimate|low_estimate|estimateLow)"\s*:\s*("?)([0-9,]+(?:\.[0-9]{1,2})?)\1', re.IGNORECASE)
+BIDSQUARE_HIGH_RE = re.compile(r'"(?:estimate_high|highEstimate|high_estimate|estimateHigh)"\s*:\s*("?)([0-9,]+(?:\.[0-9]{1,2})?)\1', re.IGNORECASE)
 
-CENTS_RE = re.compile(r'"price_cents"\s*:\s*([0-9]{3,})', re.IGNORECASE)
+CENTS_RE = re.compile(r'"price_cents"\s*:\s*([0-9]{3,})')
 NEXT_DATA_RE = re.compile(r'<script[^>]+id=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL)
 JSONLD_RE = re.compile(r'<script[^>]+type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL)
-META_CONTENT_RE = re.compile(r'<meta[^>]+(?:property|name)=["\']([^"\']+)["\'][^>]+content=["\']([^"\']+)["\']', re.IGNORECASE)
+JSONLD_COMMENT_RE = re.compile(r'^\s*(?:<!--)?\s*|\s*(?:-->)?\s*$')
+META_TAG_RE = re.compile(r'<meta\b[^>]*>', re.IGNORECASE)
+META_ATTR_RE = re.compile(r'\b(property|name|content)\s*=\s*(["\'])(.*?)\2', re.IGNORECASE | re.DOTALL)
+PRICE_WORD_RE = re.compile(r"price", re.IGNORECASE)
+# JSON-LD and <meta> normally sit near the top; the rest of the page is only scanned if none turn up there.
+HTML_HEAD_SCAN_CHARS = 200000
+HEAD_END_RE = re.compile(r"</head\s*>", re.IGNORECASE)
+ESTIMATE_WORD_RE = re.compile(r"estimate", re.IGNORECASE)
+RESERVE_WORD_RE = re.compile(r"reserve", re.IGNORECASE)
 
 def _extract_text_estimate_range(text: str) -> Tuple[Optional[str], Optional[str]]:
-    lower = text.lower()
-    idx = lower.find("estimate")
     windows = []
-    if idx != -1:
-        windows.append(text[max(0, idx - 10000): idx + 10000])
-    windows.append(text[:250000])
-    for w in windows:
-        m = DOLLAR_RANGE_RE.search(w)
-        if m:
-            return _sanitize_range(m.group(1), m.group(2))
-        m2 = USD_RANGE_RE.search(w)
-        if m2:
-            return _sanitize_range(m2.group(1), m2.group(2))
-        m3 = re.search(
-            r'(?:estimate[^0-9]{0,60})\b([0-9]{1,3}(?:,[0-9]{3})*(?:\.[0-9]{1,2})?)\s*(?:-|–|to)\s*([0-9]{1,3}(?:,[0-9]{3})*(?:\.[0-9]{1,2})?)',
-            w,
-            re.IGNORECASE,
-        )
-        if m3:
-            return _sanitize_range(m3.group(1), m3.group(2))
+    kw = ESTIMATE_WORD_RE.search(text)
+    if kw:
+        windows.append((max(0, kw.start() - 10000), kw.start() + 10000))
+    windows.append((0, 250000))
+    for pos, endpos in windows:
+        for rx in (DOLLAR_RANGE_RE, USD_RANGE_RE, ESTIMATE_NEAR_RANGE_RE):
+            m = rx.search(text, pos, endpos)
+            if m:
+                return _sanitize_range(m.group(1), m.group(2))
     return None, None
 
 def _extract_reserve_from_text(text: str) -> Optional[str]:
-    lower = text.lower()
-    if "reserve" not in lower:
+    kw = RESERVE_WORD_RE.search(text)
+    if not kw:
         return None
-    pos = lower.find("reserve")
-    window = text[max(0, pos - 10000): pos + 10000]
-    m = MONEY_CAPTURE_RE.search(window)
+    m = MONEY_CAPTURE_RE.search(text, max(0, kw.start() - 10000), kw.start() + 10000)
     if not m:
         return None
     return _sanitize_money(m.group(1))
 
+def _extract_text_estimates(html: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    text = _clean_html_text(html)
+    low, high = _extract_text_estimate_range(text)
+    return low, high, _extract_reserve_from_text(text)
+
 def _parse_next_data_json(html: str) -> Optional[Any]:
     m = NEXT_DATA_RE.search(html)
     if not m:
@@ -406,40 +622,47 @@ def _parse_next_data_json(html: str) -> Optional[Any]:
     if not raw:
         return None
     try:
-        return json.loads(raw)
-    except Exception:
+        return _json_loads(raw)
+    except (ValueError, RecursionError):
         return None
 
-def _walk_find_numbers(obj: Any, keys: List[str]) -> List[Decimal]:
-    found: List[Decimal] = []
-    wanted = {k.lower() for k in keys}
-    def rec(x: Any):
+# Lowercased __NEXT_DATA__ key -> which estimate it holds; both sides are collected in one walk.
+LA_ESTIMATE_KEYS = {
+    **{k: "low" for k in ("lowestimate", "estimatelow", "estimate_low", "low_estimate")},
+    **{k: "high" for k in ("highestimate", "estimatehigh", "estimate_high", "high_estimate")},
+}
+
+def _walk_find_numbers(obj: Any, keys: Dict[str, str]) -> Dict[str, List[int]]:
+    found: Dict[str, List[int]] = {bucket: [] for bucket in keys.values()}
+    stack: List[Any] = [obj]
+    while stack:
+        x = stack.pop()
         if isinstance(x, dict):
             for k, v in x.items():
-                lk = str(k).lower()
-                if lk in wanted:
-                    d = _to_decimal_money(v)
-                    if d is not None:
-                        found.append(d)
-                rec(v)
+                bucket = keys.get(k.lower()) if isinstance(k, str) else None
+                if bucket:
+                    c = _to_cents(v)
+                    if c is not None:
+                        found[bucket].append(c)
+                if isinstance(v, (dict, list)):
+                    stack.append(v)
         elif isinstance(x, list):
-            for it in x:
-                rec(it)
-    rec(obj)
+            stack.extend(v for v in x if isinstance(v, (dict, list)))
     return found
 
+
 def _extract_liveauctioneers_estimates(html: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
     low = high = reserve = None
     nd = _parse_next_data_json(html)
     if nd:
-        lows = _walk_find_numbers(nd, ["lowEstimate", "estimateLow", "estimate_low", "low_estimate"])
-        highs = _walk_find_numbers(nd, ["highEstimate", "estimateHigh", "estimate_high", "high_estimate"])
+        found = _walk_find_numbers(nd, LA_ESTIMATE_KEYS)
+        lows, highs = found["low"], found["high"]
         if lows and highs:
-            low = _sanitize_money(min(lows))
-            high = _sanitize_money(min(highs))
+            low = _cents_to_money(min(lows))
+            high = _cents_to_money(min(highs))
     if not low or not high:
-        mlo = re.search(r'"lowEstimate"\s*:\s*\{[^}]*"amount"\s*:\s*([0-9]+(?:\.[0-9]{1,2})?)', html, re.IGNORECASE)
-        mhi = re.search(r'"highEstimate"\s*:\s*\{[^}]*"amount"\s*:\s*([0-9]+(?:\.[0-9]{1,2})?)', html, re.IGNORECASE)
+        mlo = LA_LOW_AMOUNT_RE.search(html)
+        mhi = LA_HIGH_AMOUNT_RE.search(html)
         if mlo:
             low = low or _sanitize_money(mlo.group(1))
         if mhi:
@@ -453,30 +676,25 @@ def _extract_liveauctioneers_estimates(html: str) -> Tuple[Optional[str], Option
     return low, high, reserve
 
 def _extract_bidsquare_estimates(html: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
-    text = _clean_html_text(html)
-    low, high = _extract_text_estimate_range(text)
-    reserve = _extract_reserve_from_text(text)
+    low, high, reserve = _extract_text_estimates(html)
     if not low or not high:
         lows = []
         highs = []
-        for m in re.finditer(r'"(?:estimate_low|lowEstimate|low_estimate|estimateLow)"\s*:\s*("?)([0-9,]+(?:\.[0-9]{1,2})?)\1', html, re.IGNORECASE):
-            d = _to_decimal_money(m.group(2))
-            if d is not None:
-                lows.append(d)
-        for m in re.finditer(r'"(?:estimate_high|highEstimate|high_estimate|estimateHigh)"\s*:\s*("?)([0-9,]+(?:\.[0-9]{1,2})?)\1', html, re.IGNORECASE):
-            d = _to_decimal_money(m.group(2))
-            if d is not None:
-                highs.append(d)
+        for m in BIDSQUARE_LOW_RE.finditer(html):
+            c = _to_cents(m.group(2))
+            if c is not None:
+                lows.append(c)
+        for m in BIDSQUARE_HIGH_RE.finditer(html):
+            c = _to_cents(m.group(2))
+            if c is not None:
+                highs.append(c)
         if lows and highs:
-            low = low or _sanitize_money(min(lows))
-            high = high or _sanitize_money(min(highs))
+            low = low or _cents_to_money(min(lows))
+            high = high or _cents_to_money(min(highs))
     return low, high, reserve
 
 def _extract_sothebys_christies_estimates(html: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
-    text = _clean_html_text(html)
-    low, high = _extract_text_estimate_range(text)
-    reserve = _extract_reserve_from_text(text)
-    return low, high, reserve
+    return _extract_text_estimates(html)
 
 def _get_auction_estimates_by_host(host: str, html: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
     try:
@@ -486,10 +704,7 @@ def _get_auction_estimates_by_host(host: str, html: str) -> Tuple[Optional[str],
             return _extract_bidsquare_estimates(html)
         return _extract_sothebys_christies_estimates(html)
     except Exception:
-        text = _clean_html_text(html)
-        lo, hi = _extract_text_estimate_range(text)
-        reserve = _extract_reserve_from_text(text)
-        return lo, hi, reserve
+        return _extract_text_estimates(html)
 
 
 # ==========================================
@@ -533,14 +748,27 @@ TEXT:
 # ==========================================
 # 11) Chairish/retail helpers + JSON-LD helpers
 # ==========================================
+THUMB_SIZE_RE = re.compile(r'width=\d+&height=\d+')
+THUMB_WIDTH_RE = re.compile(r'width=(\d+)')
+TITLE_WORD_RE = re.compile(r'\w{4,}')
+PRODUCT_ANCHOR_RE = re.compile(r'<a[^>]+href=["\']([^"\']*?/product/[^"\']+)["\'][^>]*>(.*?)</a>', re.IGNORECASE | re.DOTALL)
+IMG_SRC_RE = re.compile(r'<img[^>]+src=["\']([^"\']+)["\']', re.IGNORECASE)
+# Grouped thousands need a comma here too; otherwise "1200" stops at "120" and the lazy gap absorbs the "0".
+USD_PRICE_NEAR_CURRENCY_RE = re.compile(
+    r'"price"\s*:\s*"?([0-9]{1,3}(?:,[0-9]{3})+(?:\.[0-9]{1,2})?|[0-9]+(?:\.[0-9]{1,2})?)"?'
+    r'.{0,240}?"(?:priceCurrency|currency|currencyCode)"\s*:\s*"?USD"?',
+    re.IGNORECASE | re.DOTALL
+)
+CHAIRISH_PRODUCT_URL_RE = re.compile(r'(https?://[^"\'>\s]*chairish\.com/product/[^"\'>\s]+)', re.IGNORECASE)
+
 def _is_likely_thumbnail_url(img_url: str) -> bool:
     if not img_url:
         return False
     low = img_url.lower()
     if "fit&width=265&height=265" in low or "width=265" in low or "height=265" in low:
         return True
-    if re.search(r'width=\d+&height=\d+', low):
-        m = re.search(r'width=(\d+)', low)
+    if THUMB_SIZE_RE.search(low):
+        m = THUMB_WIDTH_RE.search(low)
         if m and int(m.group(1)) < 500:
             return True
     if any(tok in low for tok in ("/thumbs/", "/thumbnail", "thumbnail=", "thumb=", "/small", "/w_")):
@@ -572,15 +800,15 @@ def _score_candidate_by_image_and_title(candidate_snippet: str, candidate_img_sr
 def _find_chairish_product_link_by_image(html: str, match_thumbnail: Optional[str], match_title: str, base_url: str) -> Optional[str]:
     canonical_prefix = f"{base_url.rstrip('/')}/product/"
     match_thumb_basename = _basename_from_url(match_thumbnail) if match_thumbnail else ""
-    title_words = re.findall(r'\w{4,}', (match_title or "").lower())
+    title_words = TITLE_WORD_RE.findall((match_title or "").lower())
     candidates: List[Tuple[int, str]] = []
-    for m in re.finditer(r'<a[^>]+href=["\']([^"\']*?/product/[^"\']+)["\'][^>]*>(.*?)</a>', html, flags=re.IGNORECASE | re.DOTALL):
+    for m in PRODUCT_ANCHOR_RE.finditer(html):
         href = m.group(1).strip()
         inner = m.group(2) or ""
         full_href = href if href.startswith("http") else urljoin(base_url, href)
         if not full_href.startswith(canonical_prefix):
             continue
-        img_m = re.search(r'<img[^>]+src=["\']([^"\']+)["\']', inner, flags=re.IGNORECASE)
+        img_m = IMG_SRC_RE.search(inner)
         img_src = img_m.group(1).strip() if img_m else ""
         if img_src and img_src.startswith("/"):
             img_src = urljoin(base_url, img_src)
@@ -590,7 +818,7 @@ def _find_chairish_product_link_by_image(html: str, match_thumbnail: Optional[st
         score = _score_candidate_by_image_and_title(snippet, img_src, match_thumb_basename, title_words)
         candidates.append((score, full_href))
     if not candidates:
-        for m in re.finditer(r'(https?://[^"\'>\s]*chairish\.com/product/[^"\'>\s]+)', html, re.IGNORECASE):
+        for m in CHAIRISH_PRODUCT_URL_RE.finditer(html):
             url = m.group(1).strip()
             if url.startswith(canonical_prefix):
                 candidates.append((1, url))
@@ -602,123 +830,169 @@ def _find_chairish_product_link_by_image(html: str, match_thumbnail: Optional[st
         return best_url
     return None
 
-def _parse_jsonld_blocks(html: str) -> List[Any]:
+def _jsonld_page_prices_usd(html: str) -> List[int]:
+    prices = _jsonld_offer_prices_usd(_parse_jsonld_blocks_until(html, HTML_HEAD_SCAN_CHARS))
+    # Head blocks are often just Organization/WebSite; a Product offer further down must still be found.
+    if not prices and len(html) > HTML_HEAD_SCAN_CHARS:
+        prices = _jsonld_offer_prices_usd(_parse_jsonld_blocks_until(html, len(html)))
+    return prices
+
+def _parse_jsonld_blocks_until(html: str, endpos: int) -> List[Any]:
     blocks: List[Any] = []
-    for m in JSONLD_RE.finditer(html):
-        raw = (m.group(1) or "").strip().strip("<!--").strip("-->")
+    for m in JSONLD_RE.finditer(html, 0, endpos):
+        raw = JSONLD_COMMENT_RE.sub("", m.group(1) or "")
         if not raw:
             continue
         try:
-            blocks.append(json.loads(raw))
-        except Exception:
+            blocks.append(_json_loads(raw))
+        except (ValueError, RecursionError):
             continue
     return blocks
 
 def _extract_meta_map(html: str) -> Dict[str, str]:
+    # <meta> belongs in <head>; stopping there also keeps script/template strings out of the map.
+    head_end = HEAD_END_RE.search(html, 0, HTML_HEAD_SCAN_CHARS)
+    if head_end:
+        return _extract_meta_map_until(html, head_end.start())
+    out = _extract_meta_map_until(html, HTML_HEAD_SCAN_CHARS)
+    if not out and len(html) > HTML_HEAD_SCAN_CHARS:
+        out = _extract_meta_map_until(html, len(html))
+    return out
+
+def _extract_meta_map_until(html: str, endpos: int) -> Dict[str, str]:
     out: Dict[str, str] = {}
-    for m in META_CONTENT_RE.finditer(html):
-        k = (m.group(1) or "").strip().lower()
-        v = (m.group(2) or "").strip()
+    for tag in META_TAG_RE.finditer(html, 0, endpos):
+        attrs = {a.lower(): v for a, _, v in META_ATTR_RE.findall(tag.group(0))}
+        k = (attrs.get("property") or attrs.get("name") or "").strip().lower()
+        v = (attrs.get("content") or "").strip()
         if k and v:
             out[k] = v
     return out
 
-def _jsonld_offer_prices_usd(blocks: List[Any]) -> List[Decimal]:
-    out: List[Decimal] = []
-    def rec(x: Any):
-        if isinstance(x, dict):
-            t = str(x.get("@type", "")).lower()
-            if "offer" in t:
-                cur = (x.get("priceCurrency") or x.get("currency") or "").strip()
-                price = x.get("price") or x.get("lowPrice") or x.get("highPrice")
-                if cur.upper() == "USD" and price is not None:
-                    d = _to_decimal_money(price)
-                    if d is not None:
-                        out.append(d)
-            if "offers" in x:
-                rec(x["offers"])
-            for v in x.values():
-                rec(v)
-        elif isinstance(x, list):
-            for it in x:
-                rec(it)
-    for b in blocks:
-        rec(b)
+# Once an Offer has been read, only these keys can still lead to further offers.
+JSONLD_OFFER_CHILD_KEYS = ("offers", "@graph", "itemListElement", "mainEntity")
+JSONLD_MAX_DEPTH = 32
+JSONLD_MAX_PRICES = 64
+
+def _jsonld_offer_prices_usd(blocks: List[Any]) -> List[int]:
+    out: List[int] = []
+    seen = set()
+    stack: List[Tuple[Any, int]] = [(b, 0) for b in blocks]
+    while stack and len(out) < JSONLD_MAX_PRICES:
+        x, depth = stack.pop()
+        if depth > JSONLD_MAX_DEPTH:
+            continue
+        if isinstance(x, list):
+            stack.extend((v, depth + 1) for v in x if isinstance(v, (dict, list)))
+            continue
+        if not isinstance(x, dict) or id(x) in seen:
+            continue
+        seen.add(id(x))
+        t = x.get("@type")
+        if t is None:
+            is_offer = False
+        elif isinstance(t, str):
+            is_offer = "offer" in t.lower()
+        else:
+            is_offer = "offer" in str(t).lower()
+        if is_offer:
+            cur = (x.get("priceCurrency") or x.get("currency") or "").strip()
+            price = x.get("price") or x.get("lowPrice") or x.get("highPrice")
+            if cur.upper() == "USD" and price is not None:
+                c = _to_cents(price)
+                if c is not None:
+                    out.append(c)
+            children = [x[k] for k in JSONLD_OFFER_CHILD_KEYS if k in x]
+        else:
+            children = x.values()
+        stack.extend((v, depth + 1) for v in children if isinstance(v, (dict, list)))
     return out
 
+def _price_text_window(text: str) -> str:
+    m = PRICE_WORD_RE.search(text)
+    if not m:
+        return text[:250000]
+    idx = m.start()
+    return text[max(0, idx - 12000): idx + 18000]
+
+# First "$" amount in a meta value or text window; "$1200" is read whole, not as "$120".
+PRICE_DOLLAR_RE = re.compile(r'\$\s*([0-9]{1,3}(?:,[0-9]{3})+(?:\.[0-9]{1,2})?|[0-9]+(?:\.[0-9]{1,2})?)')
+
+# The listing's own price comes first in the markup; later hits are related items and recommendations.
+PRICE_SCAN_MAX_HITS = 25
+
+def _plausible_min_price(candidates: List[int]) -> Optional[str]:
+    plausible = [c for c in candidates if 1000 <= c <= 200_000_000]
+    if not plausible:
+        return None
+    return _cents_to_money(min(plausible))
+
 def _extract_1stdibs_price(html: str) -> Optional[str]:
-    candidates: List[Decimal] = []
-    blocks = _parse_jsonld_blocks(html)
-    candidates.extend(_jsonld_offer_prices_usd(blocks))
-    for m in re.finditer(
-        r'"price"\s*:\s*"?([0-9]{1,3}(?:,[0-9]{3})*(?:\.[0-9]{1,2})?|[0-9]+(?:\.[0-9]{1,2})?)"?'
-        r'.{0,240}?"(?:priceCurrency|currency|currencyCode)"\s*:\s*"?USD"?',
-        html,
-        flags=re.IGNORECASE | re.DOTALL,
-    ):
-        d = _to_decimal_money(m.group(1))
-        if d is not None:
-            candidates.append(d)
+    price = _plausible_min_price(_jsonld_page_prices_usd(html))
+    if price:
+        return price
+    candidates: List[int] = []
+    for m in USD_PRICE_NEAR_CURRENCY_RE.finditer(html):
+        c = _to_cents(m.group(1))
+        if c is not None:
+            candidates.append(c)
+            if len(candidates) >= PRICE_SCAN_MAX_HITS:
+                break
+    price = _plausible_min_price(candidates)
+    if price:
+        return price
+    candidates = []
     meta = _extract_meta_map(html)
     for k in ("product:price:amount", "og:price:amount", "twitter:data1", "og:description", "og:title"):
         if k in meta:
-            d = _to_decimal_money(meta[k])
-            if d is not None:
-                candidates.append(d)
-    plausible = [c for c in candidates if Decimal("10") <= c <= Decimal("2000000")]
-    if not plausible:
-        return None
-    return _sanitize_money(min(plausible))
+            c = _to_cents(meta[k])
+            if c is not None:
+                candidates.append(c)
+    return _plausible_min_price(candidates)
 
 def _extract_chairish_price(html: str) -> Optional[str]:
-    blocks = _parse_jsonld_blocks(html)
-    prices = _jsonld_offer_prices_usd(blocks)
-    plausible = [p for p in prices if Decimal("10") <= p <= Decimal("2000000")]
-    if plausible:
-        return _sanitize_money(min(plausible))
-    cents = []
-    for m in CENTS_RE.finditer(html):
-        try:
-            cents.append(int(m.group(1)))
-        except Exception:
-            continue
-        if len(cents) >= 25:
+    price = _plausible_min_price(_jsonld_page_prices_usd(html))
+    if price:
+        return price
+    min_cents = None
+    for hits, m in enumerate(CENTS_RE.finditer(html), 1):
+        c = int(m.group(1))
+        if c >= 1000 and (min_cents is None or c < min_cents):
+            min_cents = c
+        if hits >= PRICE_SCAN_MAX_HITS:
             break
-    cents_plaus = [c for c in cents if c >= 1000]
-    if cents_plaus:
-        return _sanitize_money(Decimal(min(cents_plaus)) / Decimal(100))
+    if min_cents is not None:
+        return _cents_to_money(min_cents)
     meta = _extract_meta_map(html)
     for mk in ("og:title", "og:description", "twitter:title", "twitter:description", "description"):
         if mk in meta:
-            mm = re.search(r'\$\s*([0-9]{1,3}(?:,[0-9]{3})*(?:\.[0-9]{1,2})?)', meta[mk])
+            mm = PRICE_DOLLAR_RE.search(meta[mk])
             if mm:
                 p = _sanitize_money(mm.group(1))
                 if p:
                     return p
-    text = _clean_html_text(html)
-    idx = text.lower().find("price")
-    window = text[max(0, idx - 12000): idx + 18000] if idx != -1 else text[:250000]
-    mm2 = re.search(r'\$\s*([0-9]{1,3}(?:,[0-9]{3})*(?:\.[0-9]{1,2})?)', window)
+    if "$" not in html:
+        return None
+    window = _price_text_window(_clean_html_text(html))
+    mm2 = PRICE_DOLLAR_RE.search(window)
     if mm2:
         return _sanitize_money(mm2.group(1))
     return None
 
 def _extract_retail_price_generic(html: str) -> Optional[str]:
-    blocks = _parse_jsonld_blocks(html)
-    prices = _jsonld_offer_prices_usd(blocks)
-    plausible = [p for p in prices if Decimal("10") <= p <= Decimal("2000000")]
-    if plausible:
-        return _sanitize_money(min(plausible))
+    price = _plausible_min_price(_jsonld_page_prices_usd(html))
+    if price:
+        return price
     meta = _extract_meta_map(html)
     for mk in ("product:price:amount", "og:price:amount", "og:title", "og:description"):
         if mk in meta:
             p = _sanitize_money(meta[mk])
             if p:
                 return p
-    text = _clean_html_text(html)
-    idx = text.lower().find("price")
-    window = text[max(0, idx - 12000): idx + 18000] if idx != -1 else text[:250000]
-    mm = re.search(r'\$\s*([0-9]{1,3}(?:,[0-9]{3})*(?:\.[0-9]{1,2})?)', window)
+    if "$" not in html:
+        return None
+    window = _price_text_window(_clean_html_text(html))
+    mm = PRICE_DOLLAR_RE.search(window)
     if mm:
         return _sanitize_money(mm.group(1))
     return None
@@ -727,133 +1001,298 @@ def _extract_retail_price_generic(html: str) -> Optional[str]:
 # ==========================================
 # 12) Enrichment with Chairish canonical enforcement + redirect detection
 # ==========================================
-def enrich_matches_with_prices(matches: list[dict], max_to_scrape: int = 10) -> list[dict]:
+SCRAPE_MAX_WORKERS = 8
+# The pool is shared by every session; a batch stops waiting after this long and leaves the stragglers unpriced.
+SCRAPE_BATCH_TIMEOUT = 90
+SCRAPE_CACHE_PATH = os.path.expanduser("~/.newel_scrape_cache.sqlite3")
+SCRAPE_CACHE_TTL = 7 * 86400
+SCRAPE_STORE_RETENTION = 30 * 86400
+# Bump when extraction logic changes; rows written by another version are ignored and age out.
+EXTRACTOR_VERSION = 1
+
+# Streamlit re-executes this file on every rerun, so the worker pool is kept as a process-wide resource.
+@st.cache_resource
+def _scrape_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=SCRAPE_MAX_WORKERS, thread_name_prefix="scrape")
+
+def _open_scrape_store() -> sqlite3.Connection:
+    conn = sqlite3.connect(SCRAPE_CACHE_PATH, timeout=5)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS scrape_rows (url TEXT NOT NULL, variant TEXT NOT NULL, "
+        "stored_at REAL NOT NULL, data TEXT NOT NULL, PRIMARY KEY (url, variant))"
+    )
+    return conn
+
+def _scrape_variant(use_gemini: bool, la_login: bool) -> str:
+    # The same URL extracts differently with the Gemini fallback or a LiveAuctioneers login, so each combination is stored apart.
+    return f"v={EXTRACTOR_VERSION};gemini={int(use_gemini)};la={int(la_login)}"
+
+def _has_price(update: Dict[str, Any]) -> bool:
+    return bool(update.get("retail_price") or update.get("auction_low") or update.get("auction_high"))
+
+def _scrape_store_load(urls: List[str], variant: str) -> Dict[str, Tuple[float, Dict[str, Any]]]:
+    """Returns url -> (stored_at, update) for every URL stored under variant, stale or not."""
+    if not urls:
+        return {}
+    out: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+    try:
+        conn = _open_scrape_store()
+        try:
+            marks = ",".join("?" * len(urls))
+            rows = conn.execute(
+                f"SELECT url, stored_at, data FROM scrape_rows WHERE variant = ? AND url IN ({marks})",
+                [variant, *urls],
+            ).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return {}
+    for url, stored_at, data in rows:
+        try:
+            out[url] = (stored_at, _json_loads(data))
+        except ValueError:
+            continue
+    return out
+
+def _scrape_store_save(items: Dict[str, Dict[str, Any]], variant: str) -> None:
+    if not items:
+        return
+    now = time.time()
+    try:
+        conn = _open_scrape_store()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO scrape_rows (url, variant, stored_at, data) VALUES (?, ?, ?, ?)",
+                    [(url, variant, now, json.dumps(update, default=str)) for url, update in items.items()],
+                )
+                # Rows past retention are too old to be worth revalidating.
+                conn.execute("DELETE FROM scrape_rows WHERE stored_at < ?", (now - SCRAPE_STORE_RETENTION,))
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        pass
+
+def _scrape_listing(
+    original_url: str,
+    host: str,
+    kind: Optional[str],
+    match_title: str,
+    match_thumbnail: str,
+    session: requests.Session,
+    use_gemini: bool,
+    debug_chair: bool,
+    prev: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, Any], List[Tuple[Any, ...]]]:
+    """
+    Fetches one listing and extracts its price fields.
+    prev is an expired cache entry; its validators make the fetch conditional and it is reused on a 304.
+    If the revalidation fails outright, prev is still returned for this session but not re-stored.
+    Runs on a worker thread, so it never touches st.*; debug lines are returned for the caller to write.
+    """
+    debug: List[Tuple[Any, ...]] = []
+    # Non-Chairish retail pages only need their head when it already has a USD offer; Chairish is
+    # scanned for product links and auction estimates sit in the body.
+    stop_at_head = kind == "retail" and not host.endswith("chairish.com")
+    html, status, final_url, validators = _fetch_page(
+        original_url, session, (prev or {}).get("_validators"), stop_at_priced_head=stop_at_head
+    )
+    if prev is not None:
+        if status == 304:
+            return dict(prev, _validators=validators), debug
+        if not html:
+            return dict(prev, _http_status=status), debug
+    update: Dict[str, Any] = {"_http_status": status}
+    if validators:
+        update["_validators"] = validators
+    if not html:
+        return update, debug
+    # Chairish handling: ensure final_url is a product page before extracting price
+    if host.endswith("chairish.com"):
+        parsed = urlparse(original_url)
+        base_url = f"{parsed.scheme}://{parsed.netloc}"
+        canonical_prefix = f"{base_url.rstrip('/')}/product/"
+        product_url = None
+        product_html = None
+        product_final = None
+        # If SerpAPI link already points to /product/, verify it didn't redirect away
+        if original_url.startswith(canonical_prefix):
+            if final_url and final_url.startswith(canonical_prefix):
+                product_url = final_url
+                product_html = html
+                product_final = final_url
+            else:
+                update["product_archived"] = True
+                if debug_chair:
+                    debug.append(("Chairish: canonical product redirected/archived:", original_url, "->", final_url))
+        else:
+            # Try to find a product detail link on the page
+            try:
+                product_url = _find_chairish_product_link_by_image(html, match_thumbnail, match_title, base_url)
+            except Exception:
+                product_url = None
+            # If none found, try search page
+            if not product_url and match_title:
+                q = quote_plus(match_title)
+                search_url = f"{base_url}/search?query={q}"
+                s_html, s_status, s_final = _fetch_html(search_url, session)
+                if s_html:
+                    try:
+                        product_url = _find_chairish_product_link_by_image(s_html, match_thumbnail, match_title, base_url)
+                    except Exception:
+                        product_url = None
+            # If we found candidate, fetch and verify it doesn't redirect to a collection
+            if product_url:
+                p_html, p_status, p_final = _fetch_html(product_url, session)
+                if p_html and p_final and p_final.startswith(canonical_prefix):
+                    update["product_url"] = p_final
+                    update["link"] = p_final
+                    product_html = p_html
+                    product_final = p_final
+                    if debug_chair:
+                        debug.append(("Chairish: resolved product_url and verified:", product_final))
+                else:
+                    update["product_archived"] = True
+                    if debug_chair:
+                        debug.append(("Chairish: candidate product redirected/archived:", product_url, "->", p_final))
+            else:
+                if debug_chair:
+                    debug.append(("Chairish: no product detail resolved for:", match_title, "from", original_url))
+        # Only extract price if we have a verified product page
+        if product_html and product_final and product_final.startswith(canonical_prefix):
+            rp = _extract_chairish_price(product_html)
+            update["retail_price"] = rp
+        else:
+            if debug_chair and not update.get("retail_price"):
+                debug.append(("Chairish: skipping price extraction (no verified product page).",))
+    # Other retail/auction extraction
+    try:
+        if kind == "retail":
+            if host.endswith("1stdibs.com"):
+                rp = _extract_1stdibs_price(html)
+            elif host.endswith("chairish.com"):
+                rp = update.get("retail_price")  # only set if we verified product page above
+            else:
+                rp = _extract_retail_price_generic(html)
+            update["retail_price"] = rp
+            if (not update.get("retail_price")) and use_gemini:
+                text = _clean_html_text(html)
+                ai = _gemini_extract_retail_from_text(text, original_url)
+                if ai.get("retail_price"):
+                    update["retail_price"] = ai["retail_price"]
+        elif kind == "auction":
+            low, high, reserve = _get_auction_estimates_by_host(host, html)
+            update["auction_low"] = low
+            update["auction_high"] = high
+            update["auction_reserve"] = reserve
+            if (not update.get("auction_low") or not update.get("auction_high")) and use_gemini:
+                text = _clean_html_text(html)
+                ai = _gemini_extract_auction_from_text(text, original_url)
+                update["auction_low"] = update.get("auction_low") or ai.get("auction_low")
+                update["auction_high"] = update.get("auction_high") or ai.get("auction_high")
+                update["auction_reserve"] = update.get("auction_reserve") or ai.get("auction_reserve")
+    except Exception:
+        pass
+    return update, debug
+
+def enrich_matches_with_prices(
+    matches: list[dict],
+    max_to_scrape: int = 10,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> list[dict]:
     if "scrape_cache" not in st.session_state:
         st.session_state["scrape_cache"] = {}
+    cache = st.session_state["scrape_cache"]
     session = _get_session()
-
-    if st.session_state.get("use_la_login", False):
-        _try_login_liveauctioneers(session)
-
     debug_chair = st.session_state.get("debug_chairish", False)
+    use_gemini = st.session_state.get("use_gemini", True)
+    la_login = st.session_state.get("use_la_login", False)
+    variant = _scrape_variant(use_gemini, la_login)
 
-    scraped = 0
+    jobs: List[Tuple[dict, str, str]] = []
+    # Lens can return the same listing more than once; later copies just take the first one's result.
+    duplicates: Dict[str, List[dict]] = {}
     for m in matches:
-        if scraped >= max_to_scrape:
-            break
         original_url = (m.get("link") or "").strip()
         if not original_url:
             continue
         host = _hostname(original_url)
-        is_target = any(host.endswith(d) for d in (AUCTION_DOMAINS | RETAIL_DOMAINS))
-        if not is_target:
+        kind = _kind_from_host(host)
+        if kind == "other":
             continue
-        m.setdefault("kind", _kind_from_domain(original_url))
-        kind = m.get("kind")
-        match_title = (m.get("title") or "").strip()
-        match_thumbnail = (m.get("thumbnail") or "").strip()
-        cache_key = original_url
-        if cache_key in st.session_state["scrape_cache"]:
-            cached_update = st.session_state["scrape_cache"][cache_key]
-            m.update(cached_update)
-            scraped += 1
+        m.setdefault("kind", kind)
+        if original_url in cache:
+            m.update(cache[original_url])
             continue
-        html, status, final_url = _fetch_html(original_url, session)
-        update: Dict[str, Any] = {"_http_status": status}
-        if not html:
-            st.session_state["scrape_cache"][cache_key] = update
-            m.update(update)
-            scraped += 1
+        if original_url in duplicates:
+            duplicates[original_url].append(m)
             continue
-        # Chairish handling: ensure final_url is a product page before extracting price
-        if host.endswith("chairish.com"):
-            parsed = urlparse(original_url)
-            base_url = f"{parsed.scheme}://{parsed.netloc}"
-            canonical_prefix = f"{base_url.rstrip('/')}/product/"
-            product_url = None
-            product_html = None
-            product_final = None
-            # If SerpAPI link already points to /product/, verify it didn't redirect away
-            if original_url.startswith(canonical_prefix):
-                if final_url and final_url.startswith(canonical_prefix):
-                    product_url = final_url
-                    product_html = html
-                    product_final = final_url
-                else:
-                    update["product_archived"] = True
-                    if debug_chair:
-                        st.write("Chairish: canonical product redirected/archived:", original_url, "->", final_url)
-            else:
-                # Try to find a product detail link on the page
-                try:
-                    product_url = _find_chairish_product_link_by_image(html, match_thumbnail, match_title, base_url)
-                except Exception:
-                    product_url = None
-                # If none found, try search page
-                if not product_url and match_title:
-                    q = quote_plus(match_title)
-                    search_url = f"{base_url}/search?query={q}"
-                    s_html, s_status, s_final = _fetch_html(search_url, session)
-                    if s_html:
-                        try:
-                            product_url = _find_chairish_product_link_by_image(s_html, match_thumbnail, match_title, base_url)
-                        except Exception:
-                            product_url = None
-                # If we found candidate, fetch and verify it doesn't redirect to a collection
-                if product_url:
-                    p_html, p_status, p_final = _fetch_html(product_url, session)
-                    if p_html and p_final and p_final.startswith(canonical_prefix):
-                        update["product_url"] = p_final
-                        update["link"] = p_final
-                        product_html = p_html
-                        product_final = p_final
-                        if debug_chair:
-                            st.write("Chairish: resolved product_url and verified:", product_final)
-                    else:
-                        update["product_archived"] = True
-                        if debug_chair:
-                            st.write("Chairish: candidate product redirected/archived:", product_url, "->", p_final)
-                else:
-                    if debug_chair:
-                        st.write("Chairish: no product detail resolved for:", match_title, "from", original_url)
-            # Only extract price if we have a verified product page
-            if product_html and product_final and product_final.startswith(canonical_prefix):
-                rp = _extract_chairish_price(product_html)
-                update["retail_price"] = rp
+        duplicates[original_url] = []
+        jobs.append((m, original_url, host))
+
+    # Second tier: listings scraped in earlier sessions. Fresh entries are used as-is;
+    # stale ones are refetched conditionally and reused if the server answers 304.
+    stored = _scrape_store_load([url for _, url, _ in jobs], variant)
+    cutoff = time.time() - SCRAPE_CACHE_TTL
+    pending: List[Tuple[dict, str, str, Optional[Dict[str, Any]]]] = []
+    for m, url, host in jobs:
+        stored_at, prev = stored.get(url, (0.0, None))
+        if prev is not None and stored_at >= cutoff:
+            cache[url] = prev
+            m.update(prev)
+        else:
+            pending.append((m, url, host, prev))
+    # Only listings that need a network fetch count toward max_to_scrape; cache hits are free.
+    pending = pending[:max_to_scrape]
+    # Log in only when this batch will actually fetch a LiveAuctioneers lot.
+    if la_login and any(host.endswith("liveauctioneers.com") for _, _, host, _ in pending):
+        _try_login_liveauctioneers(session)
+    if pending:
+        # Listing fetches are network-bound, so threads overlap them; results are merged here on the script thread.
+        pool = _scrape_executor()
+        futures = [
+            pool.submit(
+                _scrape_listing,
+                url,
+                host,
+                m.get("kind"),
+                (m.get("title") or "").strip(),
+                (m.get("thumbnail") or "").strip(),
+                session,
+                use_gemini,
+                debug_chair,
+                prev,
+            )
+            for m, url, host, prev in pending
+        ]
+        deadline = time.monotonic() + SCRAPE_BATCH_TIMEOUT
+        for done, ((m, url, _, _), fut) in enumerate(zip(pending, futures), 1):
+            try:
+                update, debug = fut.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeout:
+                # Not cached, so the next run tries this listing again.
+                fut.cancel()
+                update, debug = {"_http_status": None}, []
             else:
-                if debug_chair and not update.get("retail_price"):
-                    st.write("Chairish: skipping price extraction (no verified product page).")
-        # Other retail/auction extraction
-        try:
-            if kind == "retail":
-                if host.endswith("1stdibs.com"):
-                    rp = _extract_1stdibs_price(html)
-                elif host.endswith("chairish.com"):
-                    rp = update.get("retail_price")  # only set if we verified product page above
-                else:
-                    rp = _extract_retail_price_generic(html)
-                update["retail_price"] = rp
-                if (not update.get("retail_price")) and st.session_state.get("use_gemini", True):
-                    text = _clean_html_text(html)
-                    ai = _gemini_extract_retail_from_text(text, original_url)
-                    if ai.get("retail_price"):
-                        update["retail_price"] = ai["retail_price"]
-            elif kind == "auction":
-                low, high, reserve = _get_auction_estimates_by_host(host, html)
-                update["auction_low"] = low
-                update["auction_high"] = high
-                update["auction_reserve"] = reserve
-                if (not update.get("auction_low") or not update.get("auction_high")) and st.session_state.get("use_gemini", True):
-                    text = _clean_html_text(html)
-                    ai = _gemini_extract_auction_from_text(text, original_url)
-                    update["auction_low"] = update.get("auction_low") or ai.get("auction_low")
-                    update["auction_high"] = update.get("auction_high") or ai.get("auction_high")
-                    update["auction_reserve"] = update.get("auction_reserve") or ai.get("auction_reserve")
-        except Exception:
-            pass
-        st.session_state["scrape_cache"][cache_key] = update
-        m.update(update)
-        scraped += 1
+                cache[url] = update
+            for line in debug:
+                st.write(*line)
+            m.update(update)
+            if on_progress:
+                on_progress(done, len(pending))
+        # Failed fetches and unpriced pages stay session-only so a transient miss isn't pinned for a week.
+        _scrape_store_save(
+            {
+                url: cache[url]
+                for _, url, _, _ in pending
+                if url in cache and cache[url].get("_http_status") == 200 and _has_price(cache[url])
+            },
+            variant,
+        )
+    for url, same in duplicates.items():
+        if url in cache:
+            for m in same:
+                m.update(cache[url])
     return matches
 
 
@@ -869,29 +1308,37 @@ def export_to_google_sheets(results: dict):
     auctions = [m for m in matches if m.get("kind") == "auction"][:3]
     retails = [m for m in matches if m.get("kind") == "retail"][:3]
     def build_row(items, is_auc):
-        row = [ts, f'=IMAGE("{img_url}")', img_url]
-        for i in range(3):
-            if i < len(items):
-                m = items[i]
-                row.extend([m.get("title"), m.get("link")])
-                if is_auc:
-                    row.extend([m.get("auction_low"), m.get("auction_high"), m.get("auction_reserve")])
-                else:
-                    row.append(m.get("retail_price"))
+        # Three fixed-width slots per row; empty slots stay blank.
+        width = 5 if is_auc else 3
+        row = [ts, f'=IMAGE("{img_url}")', img_url] + [""] * (3 * width)
+        for i, m in enumerate(items[:3]):
+            off = 3 + i * width
+            if is_auc:
+                row[off:off + width] = [m.get("title"), m.get("link"), m.get("auction_low"), m.get("auction_high"), m.get("auction_reserve")]
             else:
-                row.extend([""] * (5 if is_auc else 3))
+                row[off:off + width] = [m.get("title"), m.get("link"), m.get("retail_price")]
         return row
     sa_info = st.secrets["google_service_account"]
     creds = service_account.Credentials.from_service_account_info(sa_info, scopes=["https://www.googleapis.com/auth/spreadsheets"])
     creds.refresh(Request())
-    for tab, items, is_auc in [("Auction", auctions, True), ("Retail", retails, False)]:
-        requests.post(
+    def append_row(http: requests.Session, tab: str, row: list):
+        r = http.post(
             f"https://sheets.googleapis.com/v4/spreadsheets/{sheet_id}/values/{tab}!A:Z:append",
             params={"valueInputOption": "USER_ENTERED"},
-            headers={"Authorization": f"Bearer {creds.token}"},
-            json={"values": [build_row(items, is_auc)]},
+            json={"values": [row]},
             timeout=30,
         )
+        r.raise_for_status()
+    # The two tabs are independent appends; send them together over one pooled session.
+    with requests.Session() as http:
+        http.headers["Authorization"] = f"Bearer {creds.token}"
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [
+                pool.submit(append_row, http, "Auction", build_row(auctions, True)),
+                pool.submit(append_row, http, "Retail", build_row(retails, False)),
+            ]
+            for fut in futures:
+                fut.result()
 
 
 # ==========================================
@@ -900,7 +1347,7 @@ def export_to_google_sheets(results: dict):
 def _strip_tags(v: Any) -> str:
     if v is None:
         return ""
-    return re.sub(r"<[^>]+>", "", str(v))
+    return TAG_RE.sub("", str(v))
 
 def _display_money_value(v: Any) -> str:
     if v is None:
@@ -908,14 +1355,10 @@ def _display_money_value(v: Any) -> str:
     sanitized = _sanitize_money(v)
     if sanitized:
         return sanitized
-    s = str(v)
-    m = MONEY_CAPTURE_RE.search(_strip_tags(s))
-    if m:
-        try:
-            return _format_money(Decimal(m.group(1).replace(",", "")))
-        except Exception:
-            pass
-    stripped = _strip_tags(s).strip()
+    stripped = _strip_tags(v).strip()
+    c = _to_cents(stripped)
+    if c is not None:
+        return _format_cents(c)
     return html_escape(stripped) if stripped else "—"
 
 def _pill_html(label: str, value_text: str) -> str:
@@ -932,7 +1375,13 @@ def render_match_card_native(m: dict, kind_for_view: str):
         st.markdown('<div class="result-card">', unsafe_allow_html=True)
         c1, c2 = st.columns([1, 6], gap="medium")
         with c1:
-            if thumb:
+            if thumb.startswith(("https://", "http://")):
+                # Lens thumbnails are remote URLs; let the browser defer the ones scrolled out of view.
+                st.markdown(
+                    f'<img src="{html_escape(thumb, quote=True)}" loading="lazy" decoding="async" width="110" alt="">',
+                    unsafe_allow_html=True,
+                )
+            elif thumb:
                 st.image(thumb, width=110)
             else:
                 st.write("")
@@ -941,7 +1390,7 @@ def render_match_card_native(m: dict, kind_for_view: str):
             st.markdown(f"<span class=\"meta\">Source: {html_escape(source)}</span>", unsafe_allow_html=True)
             # Show archived pill if present
             if m.get("product_archived"):
-                components.html(f"<div style='margin-top:8px'>{_pill_html('Product', 'archived / removed')}</div>", height=36, scrolling=False)
+                st.markdown(f"<div style='margin-top:8px'>{_pill_html('Product', 'archived / removed')}</div>", unsafe_allow_html=True)
             if kind_for_view == "auction":
                 pills_html = (
                     _pill_html("Low Estimate", _display_money_value(m.get("auction_low")))
@@ -950,10 +1399,10 @@ def render_match_card_native(m: dict, kind_for_view: str):
                     + " "
                     + _pill_html("Auction Reserve", _display_money_value(m.get("auction_reserve")))
                 )
-                components.html(f"<div style='display:flex;gap:8px;align-items:center'>{pills_html}</div>", height=56, scrolling=False)
+                st.markdown(f"<div style='display:flex;gap:8px;align-items:center'>{pills_html}</div>", unsafe_allow_html=True)
             elif kind_for_view == "retail":
                 pill = _pill_html("Retail Price", _display_money_value(m.get("retail_price")))
-                components.html(f"<div style='display:flex;gap:8px;align-items:center'>{pill}</div>", height=48, scrolling=False)
+                st.markdown(f"<div style='display:flex;gap:8px;align-items:center'>{pill}</div>", unsafe_allow_html=True)
             else:
                 conf = m.get("confidence")
                 if conf is not None:
@@ -965,6 +1414,27 @@ def render_match_card_native(m: dict, kind_for_view: str):
                     st.markdown(f"[VIEW LISTING]({link})")
         st.markdown("</div>", unsafe_allow_html=True)
 
+MATCH_CARDS_PER_PAGE = 10
+
+def _show_more_cards(shown_key: str, shown: int):
+    st.session_state[shown_key] = shown + MATCH_CARDS_PER_PAGE
+
+def render_match_list(subset: List[dict], kind_for_view: str, empty_message: str):
+    if not subset:
+        st.info(empty_message)
+        return
+    shown_key = f"match_cards_shown_{kind_for_view}"
+    shown = st.session_state.get(shown_key, MATCH_CARDS_PER_PAGE)
+    for m in subset[:shown]:
+        render_match_card_native(m, kind_for_view=kind_for_view)
+    if len(subset) > shown:
+        st.button(
+            f"Show more ({len(subset) - shown} remaining)",
+            key=f"show_more_{kind_for_view}",
+            on_click=_show_more_cards,
+            args=(shown_key, shown),
+        )
+
 
 # ==========================================
 # 15) Content generation wrappers (Gemini)
@@ -1059,6 +1529,44 @@ Return ONLY a comma-separated list.
 """
     return _gemini_text(prompt)
 
+CONTENT_FIELDS = ("auction_title", "auction_description", "newel_title", "newel_description", "keywords")
+
+def generate_all_content(results: dict) -> Dict[str, str]:
+    auction_ctx = _content_context_for_mode(results, "auction")
+    retail_ctx = _content_context_for_mode(results, "retail")
+    prompt = f"""
+You are an expert auction cataloger and you also write listing content for Newel (high-end vintage & antique furniture).
+Return ONLY valid JSON with exactly these keys (all string values):
+{{"auction_title": "...", "auction_description": "...", "newel_title": "...", "newel_description": "...", "keywords": "..."}}
+
+- auction_title: concise, high-quality AUCTION TITLE (max 12 words).
+- auction_description: AUCTION DESCRIPTION (120-200 words). Professional, factual, sales-appropriate; avoid overclaiming.
+  If maker/designer is uncertain, use cautious language (e.g., "attributed to", "in the manner of").
+- newel_title: NEWEL TITLE (max 12 words). Elegant, accurate, SEO-friendly. Avoid hype.
+- newel_description: NEWEL DESCRIPTION (140-220 words). Include likely maker/designer attribution (cautious if uncertain),
+  materials/finish clues (if inferable), style/period keywords, and a condition note phrased safely
+  (e.g., "consistent with age and use" if unknown).
+- keywords: 15-25 SEO KEYWORDS/PHRASES for a Newel listing as one comma-separated string. Include style, period, materials, category.
+
+Use the reference listings as guidance. Do NOT include source names in any field.
+Base the auction fields on the auction listings and the Newel fields and keywords on the retail listings.
+
+Auction reference:
+{auction_ctx}
+
+Retail reference:
+{retail_ctx}
+"""
+    # Not cached: pressing the button again is how the user asks for a different draft.
+    data = _gemini_json_uncached(prompt)
+    out = {}
+    for k in CONTENT_FIELDS:
+        v = data.get(k) if isinstance(data, dict) else None
+        if isinstance(v, list):
+            v = ", ".join(str(x).strip() for x in v if str(x).strip())
+        out[k] = str(v or "").strip()
+    return out
+
 
 # ==========================================
 # 16) Sidebar + Main UI (with traceback capture)
@@ -1089,57 +1597,61 @@ st.markdown("<h1>Newel Appraiser</h1>", unsafe_allow_html=True)
 st.header("1. Upload Item Image")
 uploaded_file = st.file_uploader("Upload item photo for appraisal", type=["jpg", "jpeg", "png"])
 if uploaded_file:
-    st.session_state["uploaded_image_bytes"] = uploaded_file.getvalue()
-    st.session_state["uploaded_image_meta"] = {"filename": uploaded_file.name, "content_type": uploaded_file.type}
+    st.session_state["uploaded_image_meta"] = {
+        "filename": uploaded_file.name,
+        "content_type": uploaded_file.type,
+        "size": uploaded_file.size,
+    }
     st.image(uploaded_file, width=420)
 
 st.header("2. Run Appraisal")
 run = st.button("Run Appraisal", disabled=not uploaded_file)
 if run:
-    with st.spinner("Processing..."):
+    with st.status("Running appraisal...", expanded=False) as status:
         try:
-            s3 = boto3.client(
-                "s3",
-                region_name=_get_secret("AWS_REGION"),
-                aws_access_key_id=_get_secret("AWS_ACCESS_KEY_ID"),
-                aws_secret_access_key=_get_secret("AWS_SECRET_ACCESS_KEY"),
-            )
+            status.update(label="Uploading image...")
+            s3 = _s3_client()
             key = f"uploads/{uuid.uuid4().hex}_{uploaded_file.name}"
-            s3.put_object(
-                Bucket=_get_secret("S3_BUCKET"),
-                Key=key,
-                Body=st.session_state["uploaded_image_bytes"],
-                ContentType=st.session_state["uploaded_image_meta"]["content_type"],
-            )
+            # Presigning is local signing only, so the URL is ready before the upload starts.
             presigned_url = s3.generate_presigned_url(
                 "get_object",
                 Params={"Bucket": _get_secret("S3_BUCKET"), "Key": key},
                 ExpiresIn=3600,
             )
-            lens = requests.get(
-                "https://serpapi.com/search.json",
-                params={"engine": "google_lens", "url": presigned_url, "api_key": _get_secret("SERPAPI_API_KEY")},
-                timeout=60,
-            ).json()
-            raw_matches = [
-                {
+            # Read the photo once per run; s3transfer closes the file object it is handed, so it gets its own BytesIO.
+            image_bytes = uploaded_file.getvalue()
+            image_sha256 = hashlib.sha256(image_bytes).hexdigest()
+            s3.upload_fileobj(
+                io.BytesIO(image_bytes),
+                _get_secret("S3_BUCKET"),
+                key,
+                ExtraArgs={"ContentType": st.session_state["uploaded_image_meta"]["content_type"]},
+                Config=S3_UPLOAD_CONFIG,
+            )
+            status.update(label="Searching Google Lens for visual matches...")
+            lens = _lens_search(image_sha256, presigned_url)
+            raw_matches = []
+            for i in lens.get("visual_matches", [])[:18]:
+                kind = _kind_from_domain(i.get("link") or "")
+                raw_matches.append({
                     "title": i.get("title"),
                     "source": i.get("source"),
                     "link": i.get("link"),
                     "thumbnail": i.get("thumbnail"),
-                }
-                for i in lens.get("visual_matches", [])[:18]
-            ]
-            for m in raw_matches:
-                m["kind"] = _kind_from_domain(m.get("link") or "")
-                m.setdefault("confidence", 0.75 if m["kind"] in ("auction", "retail") else 0.35)
+                    "kind": kind,
+                    "confidence": 0.75 if kind in ("auction", "retail") else 0.35,
+                })
+            enrich_failed = False
             if st.session_state.get("use_scrape_prices", True):
+                status.update(label=f"Found {len(raw_matches)} matches; pricing listings...")
                 try:
                     raw_matches = enrich_matches_with_prices(
                         raw_matches,
                         max_to_scrape=int(st.session_state.get("max_scrape_links", 10)),
+                        on_progress=lambda done, total: status.update(label=f"Pricing listings ({done}/{total})..."),
                     )
                 except Exception:
+                    enrich_failed = True
                     tb = traceback.format_exc()
                     st.error("Error during enrich_matches_with_prices — full traceback follows below.")
                     st.code(tb)
@@ -1158,8 +1670,16 @@ if run:
                 "newel_description": "",
                 "keywords": "",
             }
+            for view_kind in ("auction", "retail", "other"):
+                st.session_state.pop(f"match_cards_shown_{view_kind}", None)
+            if enrich_failed:
+                # Matches are still saved, but keep the traceback above in view rather than behind a green label.
+                status.update(label=f"Found {len(raw_matches)} matches; price scraping failed", state="error", expanded=True)
+            else:
+                status.update(label=f"Appraisal complete: {len(raw_matches)} matches", state="complete")
         except Exception:
             tb = traceback.format_exc()
+            status.update(label="Appraisal failed", state="error", expanded=True)
             st.error("An unexpected error occurred while running the appraisal. Full traceback:")
             st.code(tb)
             st.session_state["last_run_traceback"] = tb
@@ -1180,23 +1700,13 @@ else:
     with left_col:
         matches = res.get("traceability", {}).get("search_summary", {}).get("top_matches", [])
         if view_mode == "Auction Results":
-            subset = [m for m in matches if m.get("kind") == "auction"]
-            if not subset:
-                st.info("No auction matches found.")
-            for m in subset:
-                render_match_card_native(m, kind_for_view="auction")
+            render_match_list([m for m in matches if m.get("kind") == "auction"], "auction", "No auction matches found.")
         elif view_mode == "Retail Listings":
-            subset = [m for m in matches if m.get("kind") == "retail"]
-            if not subset:
-                st.info("No retail matches found.")
-            for m in subset:
-                render_match_card_native(m, kind_for_view="retail")
+            render_match_list([m for m in matches if m.get("kind") == "retail"], "retail", "No retail matches found.")
         else:
-            subset = [m for m in matches if m.get("kind") not in ("auction", "retail")]
-            if not subset:
-                st.info("No other matches.")
-            for m in subset:
-                render_match_card_native(m, kind_for_view="other")
+            render_match_list(
+                [m for m in matches if m.get("kind") not in ("auction", "retail")], "other", "No other matches."
+            )
         st.divider()
         if st.button("Export to Google Sheets"):
             with st.spinner("Exporting rows..."):
@@ -1211,6 +1721,9 @@ else:
         if not st.session_state.get("use_gemini", True):
             st.info("Turn on **AI Mode** in the sidebar to generate content.")
         else:
+            if view_mode in ("Auction Results", "Retail Listings") and st.button("Generate All Content", type="primary"):
+                with st.spinner("Generating titles, descriptions and keywords..."):
+                    st.session_state["content_outputs"] = generate_all_content(res)
             if view_mode == "Auction Results":
                 st.subheader("Auction Content")
                 if st.button("Generate Auction Title"):